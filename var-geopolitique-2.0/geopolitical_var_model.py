@@ -4,20 +4,119 @@ Auteur: CHEMLAL Ismail
 Description: Implémentation d'un modèle VaR enrichi par signaux géopolitiques
 """
 
+import os
+import argparse
+import importlib.util
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 import pandas as pd
-import yfinance as yf
 from scipy import stats
 from datetime import datetime, timedelta
 import warnings
 warnings.filterwarnings('ignore')
 
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+# ============================================================================
+# NOYAUX NUMÉRIQUES
+# ============================================================================
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, nogil=True)
+    def _scan_violations(losses, var_values):
+        """
+        Compte les violations de VaR et cumule les excès de pertes
+        en un seul passage compilé (séquentiel, exécuté sans GIL)
+        """
+        n_violations = 0
+        sum_excess = 0.0
+        max_excess = 0.0
+        for i in range(losses.size):
+            if losses[i] > var_values[i]:
+                excess = losses[i] - var_values[i]
+                n_violations += 1
+                sum_excess += excess
+                max_excess = max(max_excess, excess)
+        return n_violations, sum_excess, max_excess
+    
+    @njit(cache=True, nogil=True)
+    def _max_drawdown(returns):
+        """
+        Maximum drawdown (en %) calculé en un seul passage, sans
+        allouer les séries cumulées intermédiaires (balayage séquentiel,
+        exécuté sans GIL)
+        """
+        if returns.size == 0:
+            return np.nan  # comme drawdown.min() sur une série vide
+        cumulative = 1.0
+        running_max = -np.inf  # le pic part du premier cumul, comme cummax()
+        max_dd = 0.0
+        for i in range(returns.size):
+            cumulative *= 1.0 + returns[i]
+            if cumulative > running_max:
+                running_max = cumulative
+            drawdown = (cumulative - running_max) / running_max
+            if drawdown < max_dd:
+                max_dd = drawdown
+        return max_dd * 100
+else:
+    def _scan_violations(losses, var_values):
+        """
+        Compte les violations de VaR et cumule les excès de pertes
+        (version NumPy si numba n'est pas installé)
+        """
+        violations = losses > var_values
+        excess = losses[violations] - var_values[violations]
+        max_excess = excess.max() if excess.size > 0 else 0.0
+        return int(violations.sum()), excess.sum(), max_excess
+    
+    def _max_drawdown(returns):
+        """
+        Maximum drawdown (en %) à partir des rendements
+        (version NumPy si numba n'est pas installé)
+        """
+        if returns.size == 0:
+            return np.nan
+        cumulative_returns = np.cumprod(1.0 + returns)
+        running_max = np.maximum.accumulate(cumulative_returns)
+        drawdown = (cumulative_returns - running_max) / running_max
+        return drawdown.min() * 100
+
+
+def _parquet_available():
+    """
+    Indique si pyarrow est installé (seul moteur utilisé par le cache:
+    fastparquet n'accepte pas memory_map à la lecture)
+    """
+    return importlib.util.find_spec('pyarrow') is not None
+
+
+def _has_prices(data):
+    """Indique si un téléchargement contient des prix exploitables (échec yfinance: tableau vide)"""
+    return not data.empty and 'Adj Close' in data
+
+
+def _aligned_values(series, index):
+    """
+    Valeurs de la série alignées sur l'index donné, en accès positionnel
+    direct lorsque les index sont déjà identiques
+    """
+    if series.index is index or series.index.equals(index):
+        return series.to_numpy(dtype=float)
+    return series.reindex(index).to_numpy(dtype=float)
+
+
 class GeopoliticalVaRModel:
     """
     Modèle VaR intégrant les signaux géopolitiques temps réel
     """
     
-    def __init__(self, confidence_level=0.95, window=252):
+    def __init__(self, confidence_level=0.95, window=252, cache_dir='.cache', session=None):
         """
         Paramètres:
         -----------
@@ -25,11 +124,123 @@ class GeopoliticalVaRModel:
             Niveau de confiance (défaut: 95%)
         window : int
             Fenêtre de calcul en jours (défaut: 252 = 1 an)
+        cache_dir : str or None
+            Répertoire du cache Parquet des données Yahoo Finance
+            (défaut: '.cache', None pour désactiver)
+        session : object or None
+            Session HTTP transmise à yfinance (défaut: None, yfinance gère
+            sa propre session; les versions récentes exigent curl_cffi)
         """
         self.confidence_level = confidence_level
         self.window = window
+        self.cache_dir = cache_dir
+        self.session = session
         self.alpha = 1 - confidence_level
+        # Quantile normal Φ⁻¹(α), constant pour un niveau de confiance donné
+        self._z_alpha = float(stats.norm.ppf(self.alpha))
         
+    def calculate_rolling_volatility(self, returns, window=30):
+        """
+        Calcule la volatilité roulante annualisée (en %)
+        
+        Paramètres:
+        -----------
+        returns : pd.Series
+            Rendements du marché
+        window : int
+            Fenêtre glissante en jours (défaut: 30)
+            
+        Returns:
+        --------
+        pd.Series : Volatilité annualisée
+        """
+        values = returns.to_numpy(dtype=float)
+        vol = np.full(values.size, np.nan)
+        if values.size >= window:
+            # Écart-type sur une vue glissante (sans copie des fenêtres)
+            vol[window - 1:] = sliding_window_view(values, window).std(axis=1, ddof=1)
+        return pd.Series(vol * np.sqrt(252) * 100, index=returns.index)
+    
+    def _cache_path(self, ticker, start_date, end_date):
+        """Chemin du fichier Parquet en cache (None si le cache est désactivé)"""
+        if self.cache_dir is None:
+            return None
+        return os.path.join(self.cache_dir, f"{ticker}_{start_date}_{end_date}.parquet")
+    
+    def _write_cache(self, data, cache_path):
+        """
+        Écrit les données en cache via un fichier temporaire puis un renommage
+        atomique: une écriture interrompue ne laisse pas de cache corrompu.
+        Retourne False si le cache est indisponible.
+        """
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            data.to_parquet(tmp_path, engine='pyarrow')
+            os.replace(tmp_path, cache_path)
+            return True
+        except (ImportError, OSError, ValueError):
+            # Cache indisponible (pyarrow absent, répertoire non inscriptible
+            # ou colonnes non supportées)
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return False
+    
+    def prefetch_market_data(self, tickers, start_date, end_date):
+        """
+        Télécharge plusieurs tickers en un seul appel yfinance (téléchargements
+        parallélisés par yfinance) et remplit le cache Parquet.
+        Sans effet si le cache est désactivé ou inutilisable: fetch_market_data
+        téléchargerait alors chaque ticker une seconde fois.
+        
+        Paramètres:
+        -----------
+        tickers : iterable of str
+            Symboles des tickers
+        start_date : str
+            Date de début (format: 'YYYY-MM-DD')
+        end_date : str
+            Date de fin
+            
+        Returns:
+        --------
+        list : Tickers mis en cache
+        """
+        if self.cache_dir is None or not _parquet_available():
+            return []
+        missing = [t for t in tickers
+                   if not os.path.exists(self._cache_path(t, start_date, end_date))]
+        if len(missing) < 2:
+            return []  # Un seul téléchargement: rien à grouper
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+        except OSError:
+            return []
+        if not os.access(self.cache_dir, os.W_OK):
+            return []
+        
+        import yfinance as yf  # Import différé: module lent à charger
+        
+        print(f"📊 Téléchargement groupé des données: {', '.join(missing)}...")
+        kwargs = {'session': self.session} if self.session is not None else {}
+        batch = yf.download(missing, start=start_date, end=end_date, progress=False,
+                            group_by='ticker', threads=True, **kwargs)
+        
+        cached = []
+        downloaded = set(batch.columns.get_level_values(0)) if batch.columns.nlevels > 1 else set()
+        for ticker in missing:
+            if ticker not in downloaded:
+                continue
+            # Index commun à tous les tickers: retrait des jours fermés de ce marché
+            data = batch[ticker].dropna(how='all')
+            if not _has_prices(data):
+                continue  # Échec de téléchargement: fetch_market_data réessaiera
+            if self._write_cache(data, self._cache_path(ticker, start_date, end_date)):
+                cached.append(ticker)
+        return cached
+    
     def fetch_market_data(self, ticker, start_date, end_date):
         """
         Récupère les données de marché depuis Yahoo Finance
@@ -47,14 +258,43 @@ class GeopoliticalVaRModel:
         --------
         pd.DataFrame : Prix et rendements
         """
-        print(f"📊 Téléchargement des données pour {ticker}...")
-        data = yf.download(ticker, start=start_date, end=end_date, progress=False)
-        data['Returns'] = data['Adj Close'].pct_change()
+        data = None
+        cache_path = self._cache_path(ticker, start_date, end_date)
+        
+        # Lecture du cache local (évite un nouveau téléchargement)
+        if cache_path is not None and os.path.exists(cache_path):
+            try:
+                data = pd.read_parquet(cache_path, engine='pyarrow', memory_map=True)
+            except (ImportError, OSError, ValueError):
+                data = None  # pyarrow absent ou fichier illisible: nouveau téléchargement
+            if data is not None and not _has_prices(data):
+                data = None  # Téléchargement en échec mis en cache: remplacé ci-dessous
+            if data is not None:
+                print(f"📂 Données {ticker} chargées depuis le cache ({cache_path})")
+        
+        if data is None:
+            import yfinance as yf  # Import différé: module lent à charger
+            
+            print(f"📊 Téléchargement des données pour {ticker}...")
+            kwargs = {'session': self.session} if self.session is not None else {}
+            data = yf.download(ticker, start=start_date, end=end_date, progress=False, **kwargs)
+            if not _has_prices(data):
+                # Échec ou limitation Yahoo: rien n'est mis en cache, le prochain appel réessaie
+                raise ValueError(f"Aucune donnée reçue de Yahoo Finance pour {ticker}")
+            if cache_path is not None:
+                self._write_cache(data, cache_path)
+        
+        # Rendements simples calculés directement sur le tableau des prix
+        prices = data['Adj Close'].to_numpy(dtype=float)
+        returns = np.empty_like(prices)
+        returns[0] = np.nan
+        returns[1:] = prices[1:] / prices[:-1] - 1
+        data['Returns'] = returns
         data = data.dropna()
         print(f"✓ {len(data)} observations téléchargées")
         return data
     
-    def create_gpr_index(self, data):
+    def create_gpr_index(self, data, vol=None):
         """
         Simule le GPR Index basé sur la volatilité du marché
         (En production: utiliser les vraies données de Caldara-Iacoviello)
@@ -63,27 +303,37 @@ class GeopoliticalVaRModel:
         -----------
         data : pd.DataFrame
             Données de marché avec rendements
+        vol : pd.Series, optionnel
+            Volatilité roulante 30 jours déjà calculée
             
         Returns:
         --------
         pd.Series : GPR Index simulé
         """
         # Volatilité roulante (30 jours)
-        vol = data['Returns'].rolling(window=30).std() * np.sqrt(252) * 100
+        if vol is None:
+            vol = self.calculate_rolling_volatility(data['Returns'])
         
         # Normalisation: moyenne=100, écart-type ajusté
         gpr = (vol - vol.mean()) / vol.std() * 50 + 100
         
         # Amplification lors d'événements extrêmes
-        extreme_events = (data['Returns'].abs() > data['Returns'].std() * 3)
-        gpr[extreme_events] *= 1.5
-        
-        # Lissage
-        gpr = gpr.rolling(window=5, center=True).mean()
-        
-        return gpr.fillna(100)
+        returns_values = data['Returns'].to_numpy(dtype=float)
+        threshold = 3 * returns_values.std(ddof=1)
+        extreme_events = np.abs(returns_values) > threshold
+        gpr_values = gpr.to_numpy(dtype=float, copy=True)
+        gpr_values[extreme_events] *= 1.5
+        
+        # Lissage (moyenne mobile centrée sur 5 jours, par convolution)
+        smoothed = np.full(gpr_values.size, np.nan)
+        if gpr_values.size >= 5:
+            smoothed[2:-2] = np.convolve(gpr_values, np.full(5, 0.2), mode='valid')
+        gpr = pd.Series(smoothed, index=data.index)
+        
+        # float32 suffit pour un indice reporté à 0.1 près
+        return gpr.fillna(100).astype(np.float32)
     
-    def identify_regimes(self, returns, gpr):
+    def identify_regimes(self, returns, gpr, vol=None):
         """
         Identifie les régimes de marché (Calme/Tension/Crise)
         basé sur volatilité et GPR
@@ -94,21 +344,26 @@ class GeopoliticalVaRModel:
             Rendements du marché
         gpr : pd.Series
             GPR Index
+        vol : pd.Series, optionnel
+            Volatilité roulante 30 jours déjà calculée
             
         Returns:
         --------
         pd.Series : Régimes (1=Calme, 2=Tension, 3=Crise)
         """
-        vol = returns.rolling(window=30).std() * np.sqrt(252) * 100
+        if vol is None:
+            vol = self.calculate_rolling_volatility(returns)
         
-        regimes = pd.Series(index=returns.index, dtype=int)
+        gpr_values = _aligned_values(gpr, returns.index)
+        vol_values = _aligned_values(vol, returns.index)
         
-        # Règles de classification
-        regimes[(gpr < 150) & (vol < 20)] = 1  # Calme
-        regimes[((gpr >= 150) & (gpr < 250)) | ((vol >= 20) & (vol < 30))] = 2  # Tension
-        regimes[(gpr >= 250) | (vol >= 30)] = 3  # Crise
+        # Règles de classification (Calme par défaut)
+        regimes = np.ones(len(returns), dtype=np.int8)  # Calme
+        regimes[((gpr_values >= 150) & (gpr_values < 250)) |
+                ((vol_values >= 20) & (vol_values < 30))] = 2  # Tension
+        regimes[(gpr_values >= 250) | (vol_values >= 30)] = 3  # Crise
         
-        return regimes.fillna(1)
+        return pd.Series(regimes, index=returns.index)
     
     def calculate_var_traditional(self, returns):
         """
@@ -125,7 +380,7 @@ class GeopoliticalVaRModel:
         """
         mu = returns.mean()
         sigma = returns.std()
-        var = -(mu + sigma * stats.norm.ppf(self.alpha))
+        var = -(mu + sigma * self._z_alpha)
         return var * 100
     
     def calculate_var_geopolitical(self, returns, gpr, regimes):
@@ -145,38 +400,35 @@ class GeopoliticalVaRModel:
         --------
         pd.Series : VaR dynamique
         """
-        var_geo = pd.Series(index=returns.index, dtype=float)
-        
-        # Paramètres par régime
-        regime_params = {}
-        for regime in [1, 2, 3]:
-            mask = regimes == regime
-            if mask.sum() > 30:  # Minimum 30 observations
-                regime_params[regime] = {
-                    'mu': returns[mask].mean(),
-                    'sigma': returns[mask].std()
-                }
+        # Paramètres par régime (une seule agrégation groupée), rangés dans
+        # des tableaux indexés directement par le code régime (case 0 inutilisée)
+        regime_stats = returns.groupby(regimes).agg(['mean', 'std', 'count'])
+        mu_by_regime = np.zeros(4)
+        sigma_by_regime = np.zeros(4)
+        for regime in (1, 2, 3):
+            if regime in regime_stats.index and regime_stats.loc[regime, 'count'] > 30:  # Minimum 30 observations
+                mu_by_regime[regime] = regime_stats.loc[regime, 'mean']
+                sigma_by_regime[regime] = regime_stats.loc[regime, 'std']
             else:
                 # Paramètres par défaut si pas assez de données
-                regime_params[regime] = {
-                    'mu': returns.mean(),
-                    'sigma': returns.std() * (1 + 0.5 * regime)  # Plus volatil en crise
-                }
-        
-        # Calcul VaR pour chaque période
-        for idx in returns.index:
-            if idx in regimes.index:
-                current_regime = regimes[idx]
-                params = regime_params[current_regime]
-                
-                # Ajustement par GPR
-                gpr_factor = 1 + (gpr[idx] - 100) / 500  # Amplification si GPR élevé
-                adjusted_sigma = params['sigma'] * gpr_factor
-                
-                # VaR régime-spécifique
-                var_geo[idx] = -(params['mu'] + adjusted_sigma * stats.norm.ppf(self.alpha))
-        
-        return var_geo * 100
+                mu_by_regime[regime] = returns.mean()
+                sigma_by_regime[regime] = returns.std() * (1 + 0.5 * regime)  # Plus volatil en crise
+        
+        # Calcul VaR vectorisé sur toutes les périodes
+        regime_values = _aligned_values(regimes, returns.index)
+        known = ~np.isnan(regime_values)
+        codes = np.where(known, regime_values, 1).astype(np.intp)
+        
+        # Ajustement par GPR (amplification si GPR élevé)
+        gpr_factor = 1 + (_aligned_values(gpr, returns.index) - 100) / 500
+        adjusted_sigma = sigma_by_regime[codes] * gpr_factor
+        
+        # VaR régime-spécifique
+        var_geo = -(mu_by_regime[codes] + adjusted_sigma * self._z_alpha)
+        var_geo[~known] = np.nan
+        
+        # float32 suffit pour une VaR reportée à 0.01% près
+        return pd.Series((var_geo * 100).astype(np.float32), index=returns.index)
     
     def backtest_var(self, returns, var_estimates, model_name="Model"):
         """
@@ -195,32 +447,34 @@ class GeopoliticalVaRModel:
         --------
         dict : Métriques de performance
         """
-        # Préparation des données
+        # Préparation et alignement des données
+        returns_values = returns.to_numpy(dtype=float)
         if isinstance(var_estimates, (int, float)):
-            var_series = pd.Series(var_estimates, index=returns.index)
+            var_values = np.full(returns_values.size, float(var_estimates))
+        elif var_estimates.index is returns.index or var_estimates.index.equals(returns.index):
+            # Index identiques: accès positionnel direct
+            var_values = var_estimates.to_numpy(dtype=float)
         else:
-            var_series = var_estimates
-        
-        # Alignement
-        common_idx = returns.index.intersection(var_series.index)
-        returns_aligned = returns[common_idx]
-        var_aligned = var_series[common_idx]
+            common_idx = returns.index.intersection(var_estimates.index)
+            returns_values = returns[common_idx].to_numpy(dtype=float)
+            var_values = var_estimates[common_idx].to_numpy(dtype=float)
         
         # Identification des violations
-        losses = -returns_aligned * 100  # Pertes en %
-        violations = losses > var_aligned
+        losses = -returns_values * 100  # Pertes en %
+        n_violations, sum_excess, max_excess = _scan_violations(losses, var_values)
         
-        n_violations = violations.sum()
-        n_obs = len(violations)
+        n_obs = len(losses)
         violation_rate = (n_violations / n_obs) * 100
         expected_rate = self.alpha * 100
         
         # Test de Kupiec (Coverage Test)
         p_empirical = n_violations / n_obs
         if p_empirical > 0 and p_empirical < 1:
-            kupiec_stat = -2 * np.log(
-                ((1 - self.alpha)**(n_obs - n_violations) * self.alpha**n_violations) /
-                ((1 - p_empirical)**(n_obs - n_violations) * p_empirical**n_violations)
+            # Rapport de vraisemblance en log (évite l'underflow des puissances)
+            n_ok = n_obs - n_violations
+            kupiec_stat = -2 * (
+                n_ok * np.log(1 - self.alpha) + n_violations * np.log(self.alpha)
+                - n_ok * np.log(1 - p_empirical) - n_violations * np.log(p_empirical)
             )
             kupiec_pvalue = 1 - stats.chi2.cdf(kupiec_stat, df=1)
             kupiec_result = "ACCEPTÉ" if kupiec_pvalue > 0.05 else "REJETÉ"
@@ -231,18 +485,13 @@ class GeopoliticalVaRModel:
         
         # Expected Shortfall (pertes moyennes au-delà de VaR)
         if n_violations > 0:
-            excess_losses = losses[violations] - var_aligned[violations]
-            avg_excess = excess_losses.mean()
-            max_excess = excess_losses.max()
+            avg_excess = sum_excess / n_violations
         else:
             avg_excess = 0
             max_excess = 0
         
         # Maximum Drawdown
-        cumulative_returns = (1 + returns_aligned).cumprod()
-        running_max = cumulative_returns.cummax()
-        drawdown = (cumulative_returns - running_max) / running_max
-        max_drawdown = drawdown.min() * 100
+        max_drawdown = _max_drawdown(returns_values)
         
         results = {
             'model': model_name,
@@ -291,18 +540,19 @@ class GeopoliticalVaRModel:
         
         # 2. Création GPR Index
         print("\n📈 Génération GPR Index...")
-        gpr = self.create_gpr_index(data)
+        vol = self.calculate_rolling_volatility(data['Returns'])
+        gpr = self.create_gpr_index(data, vol)
         data['GPR'] = gpr
         
         # 3. Identification des régimes
         print("🎯 Identification des régimes de marché...")
-        regimes = self.identify_regimes(data['Returns'], gpr)
+        regimes = self.identify_regimes(data['Returns'], gpr, vol)
         data['Regime'] = regimes
         
-        regime_dist = regimes.value_counts().sort_index()
-        print(f"   Calme: {regime_dist.get(1, 0)} jours ({regime_dist.get(1, 0)/len(regimes)*100:.1f}%)")
-        print(f"   Tension: {regime_dist.get(2, 0)} jours ({regime_dist.get(2, 0)/len(regimes)*100:.1f}%)")
-        print(f"   Crise: {regime_dist.get(3, 0)} jours ({regime_dist.get(3, 0)/len(regimes)*100:.1f}%)")
+        regime_dist = np.bincount(regimes.to_numpy(), minlength=4)
+        print(f"   Calme: {regime_dist[1]} jours ({regime_dist[1]/len(regimes)*100:.1f}%)")
+        print(f"   Tension: {regime_dist[2]} jours ({regime_dist[2]/len(regimes)*100:.1f}%)")
+        print(f"   Crise: {regime_dist[3]} jours ({regime_dist[3]/len(regimes)*100:.1f}%)")
         
         # 4. Calcul VaR traditionnelle
         print("\n💼 Calcul VaR Traditionnelle...")
@@ -367,22 +617,16 @@ class GeopoliticalVaRModel:
 # SCRIPT PRINCIPAL
 # ============================================================================
 
-def main():
-    """
-    Point d'entrée principal du programme
+def plot_results(results):
     """
-    # Initialisation du modèle
-    model = GeopoliticalVaRModel(confidence_level=0.95, window=252)
-    
-    # Exécution de l'analyse complète
-    results = model.run_complete_analysis(ticker='^GSPC', years=5)
+    Génère les graphiques de synthèse de l'analyse
+    (matplotlib n'est importé qu'à cet appel)
     
-    # Sauvegarde des résultats
-    print("\n💾 Sauvegarde des résultats...")
-    results['data'].to_csv('var_geopolitical_results.csv')
-    print("✓ Fichier sauvegardé: var_geopolitical_results.csv")
-    
-    # Génération de visualisations
+    Paramètres:
+    -----------
+    results : dict
+        Résultats retournés par run_complete_analysis
+    """
     try:
         import matplotlib.pyplot as plt
         plt.style.use('seaborn-v0_8-darkgrid')
@@ -440,6 +684,31 @@ def main():
         
     except ImportError:
         print("⚠️ matplotlib non disponible pour les visualisations")
+
+
+def main(argv=None):
+    """
+    Point d'entrée principal du programme
+    """
+    parser = argparse.ArgumentParser(description="VaR Géopolitique 2.0 - Modèle Prédictif")
+    parser.add_argument('--no-plot', action='store_true',
+                        help="Ne pas générer les graphiques (évite l'import de matplotlib)")
+    args = parser.parse_args(argv)
+    
+    # Initialisation du modèle
+    model = GeopoliticalVaRModel(confidence_level=0.95, window=252)
+    
+    # Exécution de l'analyse complète
+    results = model.run_complete_analysis(ticker='^GSPC', years=5)
+    
+    # Sauvegarde des résultats
+    print("\n💾 Sauvegarde des résultats...")
+    results['data'].to_csv('var_geopolitical_results.csv')
+    print("✓ Fichier sauvegardé: var_geopolitical_results.csv")
+    
+    # Génération de visualisations
+    if not args.no_plot:
+        plot_results(results)
     
     print("\n" + "="*60)
     print("✅ ANALYSE TERMINÉE AVEC SUCCÈS")
@@ -22,17 +22,23 @@
 
 # %%
 # Installation des dépendances (décommenter si nécessaire)
-# !pip install yfinance pandas numpy scipy matplotlib seaborn
+# !pip install yfinance pandas numpy scipy matplotlib seaborn pyarrow
 
 # %%
+import os
 import numpy as np
 import pandas as pd
 import yfinance as yf
 from scipy import stats
 from datetime import datetime, timedelta
 import matplotlib.pyplot as plt
+from matplotlib.lines import Line2D
 import seaborn as sns
 import warnings
+from functools import lru_cache
+
+# Noyaux numériques compilés et mis en cache sur disque (voir var_kernels.py)
+from var_kernels import rolling_std_welford, centered_moving_average, backtest_kernel
 
 # Configuration
 warnings.filterwarnings('ignore')
@@ -46,10 +52,43 @@ print(f"📅 Date d'analyse: {datetime.now().strftime('%Y-%m-%d %H:%M')}")
 # ## 📊 2. Collecte des Données
 
 # %%
-def fetch_market_data(ticker, start_date, end_date):
-    """Télécharge les données de marché"""
-    print(f"📥 Téléchargement: {ticker} ({start_date} → {end_date})")
-    data = yf.download(ticker, start=start_date, end=end_date, progress=False)
+def fetch_market_data(ticker, start_date, end_date, cache_dir='.cache'):
+    """Télécharge les données de marché (avec cache Parquet local)"""
+    cache_path = os.path.join(cache_dir, f"{ticker}_{start_date}_{end_date}.parquet")
+    data = None
+    
+    # Relecture du cache: évite un nouveau téléchargement et fige les données
+    # (pyarrow uniquement: fastparquet n'accepte pas memory_map)
+    if os.path.exists(cache_path):
+        try:
+            data = pd.read_parquet(cache_path, engine='pyarrow', memory_map=True)
+        except (ImportError, OSError, ValueError):
+            data = None  # pyarrow absent ou fichier illisible: nouveau téléchargement
+        if data is not None and (data.empty or 'Adj Close' not in data):
+            data = None  # Téléchargement en échec mis en cache: remplacé ci-dessous
+        if data is not None:
+            print(f"📂 Cache: {ticker} ({start_date} → {end_date})")
+    
+    if data is None:
+        print(f"📥 Téléchargement: {ticker} ({start_date} → {end_date})")
+        data = yf.download(ticker, start=start_date, end=end_date, progress=False)
+        if data.empty or 'Adj Close' not in data:
+            # Échec ou limitation Yahoo: rien n'est mis en cache, la prochaine exécution réessaie
+            raise ValueError(f"Aucune donnée reçue de Yahoo Finance pour {ticker}")
+        # Fichier temporaire puis renommage atomique: pas de cache à moitié écrit
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            data.to_parquet(tmp_path, engine='pyarrow', compression='zstd')
+            os.replace(tmp_path, cache_path)
+        except (ImportError, OSError, ValueError):
+            # Cache indisponible (pyarrow absent, répertoire non inscriptible
+            # ou colonnes non supportées)
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+    
     data['Returns'] = data['Adj Close'].pct_change()
     data = data.dropna()
     print(f"✓ {len(data)} observations | Période: {data.index[0].date()} à {data.index[-1].date()}")
@@ -85,34 +124,41 @@ print(f"  Kurtosis: {data['Returns'].kurtosis():.2f}")
 # du marché. En production, utiliser les vraies données du FRED.
 
 # %%
+# Volatilité roulante annualisée (30 jours), calculée une seule fois
+data['Vol30'] = rolling_std_welford(data['Returns'].to_numpy(dtype=float), 30) * np.sqrt(252) * 100
+
 def create_gpr_index(data):
     """Génère un GPR Index simulé basé sur la volatilité"""
-    # Volatilité roulante annualisée
-    vol = data['Returns'].rolling(window=30).std() * np.sqrt(252) * 100
+    # Volatilité roulante annualisée et rendements en tableaux bruts
+    vol = data['Vol30'].to_numpy(dtype=float)
+    returns = data['Returns'].to_numpy(dtype=float)
     
     # Normalisation: moyenne=100
-    gpr = (vol - vol.mean()) / vol.std() * 50 + 100
+    gpr = (vol - np.nanmean(vol)) / np.nanstd(vol, ddof=1) * 50 + 100
     
-    # Amplification des événements extrêmes
-    extreme_events = (data['Returns'].abs() > data['Returns'].std() * 3)
-    gpr[extreme_events] *= 1.5
+    # Amplification des événements extrêmes (sélection sans branchement)
+    extreme_events = np.abs(returns) > returns.std(ddof=1) * 3
+    gpr = np.where(extreme_events, gpr * 1.5, gpr)
     
     # Lissage
-    gpr = gpr.rolling(window=5, center=True).mean().fillna(100)
+    smoothed = centered_moving_average(gpr, 5)
+    smoothed[np.isnan(smoothed)] = 100
     
-    return gpr
+    # Précision simple suffisante pour un indice affiché à 0.1 près
+    return pd.Series(smoothed.astype(np.float32), index=data.index)
 
 data['GPR'] = create_gpr_index(data)
 
 print("✅ GPR Index généré")
-print(f"  Min: {data['GPR'].min():.1f} | Max: {data['GPR'].max():.1f} | Moyenne: {data['GPR'].mean():.1f}")
+gpr_values = data['GPR'].to_numpy()
+print(f"  Min: {gpr_values.min():.1f} | Max: {gpr_values.max():.1f} | Moyenne: {gpr_values.mean():.1f}")
 
 # Visualisation GPR
-fig, ax = plt.subplots(figsize=(14, 5))
+fig, ax = plt.subplots(figsize=(14, 5), dpi=100)
 ax.plot(data.index, data['GPR'], linewidth=2, label='GPR Index', color='steelblue')
 ax.axhline(y=200, color='orange', linestyle='--', linewidth=2, label='Seuil Tension')
 ax.axhline(y=300, color='red', linestyle='--', linewidth=2, label='Seuil Crise')
-ax.fill_between(data.index, 0, data['GPR'], alpha=0.2)
+ax.fill_between(data.index, 0, data['GPR'], alpha=0.2, rasterized=True)
 ax.set_title('GPR Index: Évolution des Tensions Géopolitiques', fontsize=16, fontweight='bold')
 ax.set_ylabel('GPR Index', fontsize=12)
 ax.legend(fontsize=11)
@@ -129,46 +175,59 @@ plt.show()
 # - **Crise** (3): GPR > 250, Volatilité > 30%
 
 # %%
-def identify_regimes(returns, gpr):
+def identify_regimes(returns, gpr, vol):
     """Classifie les régimes de marché"""
-    vol = returns.rolling(window=30).std() * np.sqrt(252) * 100
     
-    regimes = pd.Series(index=returns.index, dtype=int)
-    regimes[(gpr < 150) & (vol < 20)] = 1  # Calme
-    regimes[((gpr >= 150) & (gpr < 250)) | ((vol >= 20) & (vol < 30))] = 2  # Tension
-    regimes[(gpr >= 250) | (vol >= 30)] = 3  # Crise
+    gpr = gpr.to_numpy(dtype=float)
+    vol = vol.to_numpy(dtype=float)
+    
+    # Du plus sévère au plus calme: une crise l'emporte sur une tension
+    conditions = [
+        (gpr >= 250) | (vol >= 30),  # Crise
+        ((gpr >= 150) & (gpr < 250)) | ((vol >= 20) & (vol < 30)),  # Tension
+        (gpr < 150) & (vol < 20),  # Calme
+    ]
+    regimes = np.select(conditions, [3, 2, 1], default=1).astype(np.int8)
     
-    return regimes.fillna(1)
+    return pd.Series(regimes, index=returns.index)
 
-data['Regime'] = identify_regimes(data['Returns'], data['GPR'])
+data['Regime'] = identify_regimes(data['Returns'], data['GPR'], data['Vol30'])
 
 # Distribution des régimes
-regime_counts = data['Regime'].value_counts().sort_index()
+regime_counts = np.bincount(data['Regime'].to_numpy(), minlength=4)
 regime_labels = {1: 'Calme', 2: 'Tension', 3: 'Crise'}
 
 print("📊 Distribution des Régimes:")
-for regime, count in regime_counts.items():
+for regime in [1, 2, 3]:
+    count = regime_counts[regime]
+    if count == 0:
+        continue
     pct = count / len(data) * 100
     print(f"  {regime_labels[regime]}: {count} jours ({pct:.1f}%)")
 
 # Visualisation des régimes
-fig, axes = plt.subplots(2, 1, figsize=(14, 8), sharex=True)
+fig, axes = plt.subplots(2, 1, figsize=(14, 8), sharex=True, dpi=100)
 
 # Graphique 1: Rendements colorés par régime
+# Un seul scatter coloré par régime; légende construite avec des artistes proxy
 colors = {1: 'green', 2: 'orange', 3: 'red'}
-for regime in [1, 2, 3]:
-    mask = data['Regime'] == regime
-    axes[0].scatter(data.index[mask], data['Returns'][mask] * 100,
-                   c=colors[regime], alpha=0.6, s=20, label=regime_labels[regime])
+color_arr = data['Regime'].map(colors).to_numpy()
+axes[0].scatter(data.index, data['Returns'].to_numpy() * 100,
+               c=color_arr, alpha=0.6, s=20, rasterized=True)
+legend_handles = [
+    Line2D([], [], marker='o', linestyle='', color=colors[regime], alpha=0.6,
+           label=regime_labels[regime])
+    for regime in [1, 2, 3]
+]
 axes[0].axhline(y=0, color='black', linestyle='-', linewidth=0.5)
 axes[0].set_title('Rendements Quotidiens par Régime', fontsize=14, fontweight='bold')
 axes[0].set_ylabel('Rendements (%)', fontsize=12)
-axes[0].legend(fontsize=11)
+axes[0].legend(handles=legend_handles, fontsize=11)
 axes[0].grid(True, alpha=0.3)
 
 # Graphique 2: Évolution des régimes
 axes[1].fill_between(data.index, 0, data['Regime'], alpha=0.5, 
-                     step='mid', color='steelblue')
+                     step='mid', color='steelblue', rasterized=True)
 axes[1].set_title('Évolution des Régimes de Marché', fontsize=14, fontweight='bold')
 axes[1].set_ylabel('Régime', fontsize=12)
 axes[1].set_yticks([1, 2, 3])
@@ -185,12 +244,17 @@ plt.show()
 # $$VaR_\alpha = -(\mu + \sigma \cdot \Phi^{-1}(\alpha))$$
 
 # %%
+@lru_cache(maxsize=None)
+def norm_quantile(alpha):
+    """Φ⁻¹(α), évalué une seule fois par niveau de confiance"""
+    return float(stats.norm.ppf(alpha))
+
 def calculate_var_traditional(returns, confidence_level=0.95):
     """VaR paramétrique standard"""
     alpha = 1 - confidence_level
     mu = returns.mean()
     sigma = returns.std()
-    var = -(mu + sigma * stats.norm.ppf(alpha))
+    var = -(mu + sigma * norm_quantile(alpha))
     return var * 100
 
 var_traditional = calculate_var_traditional(data['Returns'])
@@ -206,49 +270,67 @@ print(f"   Interprétation: Perte maximale probable de {abs(var_traditional):.2f
 # $$VaR_{\alpha,t} = -\sum_{k=1}^{3} P(S_t=k) \times (\mu_k + \sigma_k \cdot f(GPR_t) \cdot \Phi^{-1}(\alpha))$$
 
 # %%
-def calculate_var_geopolitical(returns, gpr, regimes, confidence_level=0.95):
-    """VaR géopolitique adaptative"""
-    alpha = 1 - confidence_level
-    var_geo = pd.Series(index=returns.index, dtype=float)
+def _prep_var_geo(returns_arr, gpr_arr, regime_arr):
+    """Partie de la VaR géopolitique indépendante du niveau de confiance"""
+    # Paramètres par régime, indexés par le code régime
+    # (case 0 = régime inconnu → VaR NaN)
+    # Moyenne, écart-type et effectif de tous les régimes en une agrégation
+    regime_codes = np.array([1, 2, 3])
+    regime_stats = (pd.Series(returns_arr).groupby(regime_arr)
+                    .agg(['mean', 'std', 'count']).reindex(regime_codes))
+    enough = regime_stats['count'].fillna(0).to_numpy() > 30
+    
+    # Paramètres par défaut (plus volatils en crise) si moins de 30 observations
+    mu_by_regime = np.full(4, np.nan)
+    sigma_by_regime = np.full(4, np.nan)
+    mu_by_regime[regime_codes] = np.where(
+        enough, regime_stats['mean'].to_numpy(), returns_arr.mean()
+    )
+    sigma_by_regime[regime_codes] = np.where(
+        enough, regime_stats['std'].to_numpy(),
+        returns_arr.std(ddof=1) * (1 + 0.5 * regime_codes)
+    )
     
-    # Paramètres par régime
-    regime_params = {}
-    for regime in [1, 2, 3]:
-        mask = regimes == regime
-        if mask.sum() > 30:
-            regime_params[regime] = {
-                'mu': returns[mask].mean(),
-                'sigma': returns[mask].std()
-            }
-        else:
-            regime_params[regime] = {
-                'mu': returns.mean(),
-                'sigma': returns.std() * (1 + 0.5 * regime)
-            }
+    mu_arr = mu_by_regime[regime_arr]
+    sigma_arr = sigma_by_regime[regime_arr]
     
-    # Calcul VaR dynamique
-    for idx in returns.index:
-        if idx in regimes.index:
-            current_regime = regimes[idx]
-            params = regime_params[current_regime]
-            
-            # Facteur d'ajustement GPR
-            gpr_factor = 1 + (gpr[idx] - 100) / 500
-            adjusted_sigma = params['sigma'] * gpr_factor
-            
-            var_geo[idx] = -(params['mu'] + adjusted_sigma * stats.norm.ppf(alpha))
+    # Facteur d'ajustement GPR
+    gpr_factor = 1 + (gpr_arr - 100) / 500
+    adjusted_sigma = sigma_arr * gpr_factor
+    
+    return mu_arr, adjusted_sigma
+
+def _compute_var_geo_core(returns_arr, gpr_arr, regime_arr, alpha):
+    """Noyau NumPy de la VaR géopolitique (tableaux bruts, sans pandas)"""
+    mu_arr, adjusted_sigma = _prep_var_geo(returns_arr, gpr_arr, regime_arr)
+    
+    # Calcul VaR dynamique vectorisé (Φ⁻¹(α) mis en cache par niveau)
+    z = norm_quantile(alpha)
+    var_geo = -(mu_arr + adjusted_sigma * z)
     
     return var_geo * 100
 
+def calculate_var_geopolitical(returns, gpr, regimes, confidence_level=0.95):
+    """VaR géopolitique adaptative"""
+    var_geo = _compute_var_geo_core(
+        returns.to_numpy(dtype=float),
+        gpr.reindex(returns.index).to_numpy(dtype=float),
+        regimes.reindex(returns.index, fill_value=0).to_numpy(dtype=np.intp),
+        1 - confidence_level
+    )
+    # VaR rapportée à 0.01% près: float32 suffit (rendements et backtest restent en float64)
+    return pd.Series(var_geo.astype(np.float32), index=returns.index)
+
 data['VaR_Geopolitical'] = calculate_var_geopolitical(
     data['Returns'], data['GPR'], data['Regime']
 )
 
+var_geo_values = data['VaR_Geopolitical'].to_numpy()
 print(f"🌍 VaR Géopolitique:")
-print(f"  Moyenne: {data['VaR_Geopolitical'].mean():.2f}%")
-print(f"  Min (calme): {data['VaR_Geopolitical'].min():.2f}%")
-print(f"  Max (crise): {data['VaR_Geopolitical'].max():.2f}%")
-print(f"  Écart-type: {data['VaR_Geopolitical'].std():.2f}%")
+print(f"  Moyenne: {var_geo_values.mean():.2f}%")
+print(f"  Min (calme): {var_geo_values.min():.2f}%")
+print(f"  Max (crise): {var_geo_values.max():.2f}%")
+print(f"  Écart-type: {var_geo_values.std(ddof=1):.2f}%")
 
 # Comparaison visuelle
 fig, ax = plt.subplots(figsize=(14, 6))
@@ -279,55 +361,38 @@ def backtest_var(returns, var_estimates, model_name="Model", confidence_level=0.
     """Backtesting complet avec tests statistiques"""
     alpha = 1 - confidence_level
     
-    # Préparation
+    # Préparation, alignement et conversion unique vers NumPy
+    # (pandas reste à la frontière)
+    common_idx = returns.index
+    returns_values = returns.to_numpy(dtype=float)
     if isinstance(var_estimates, (int, float)):
-        var_series = pd.Series(var_estimates, index=returns.index)
+        var_values = np.full(returns_values.size, float(var_estimates))
+    elif var_estimates.index is returns.index or var_estimates.index.equals(returns.index):
+        # Index identiques: pas d'intersection à construire
+        var_values = var_estimates.to_numpy(dtype=float)
     else:
-        var_series = var_estimates
+        common_idx = returns.index.intersection(var_estimates.index)
+        returns_values = returns[common_idx].to_numpy(dtype=float)
+        var_values = var_estimates[common_idx].to_numpy(dtype=float)
     
-    # Alignement
-    common_idx = returns.index.intersection(var_series.index)
-    returns_aligned = returns[common_idx]
-    var_aligned = var_series[common_idx]
+    # Violations, Expected Shortfall, Kupiec et Maximum Drawdown (noyau compilé)
+    violations = -returns_values * 100 > var_values
+    n_violations, kupiec_stat, avg_excess, max_excess, max_drawdown = backtest_kernel(
+        returns_values, var_values, alpha
+    )
     
-    # Violations
-    losses = -returns_aligned * 100
-    violations = losses > var_aligned
-    
-    n_violations = violations.sum()
     n_obs = len(violations)
     violation_rate = (n_violations / n_obs) * 100
     expected_rate = alpha * 100
     
     # Test de Kupiec
-    p_empirical = n_violations / n_obs
-    if p_empirical > 0 and p_empirical < 1:
-        kupiec_stat = -2 * np.log(
-            ((1 - alpha)**(n_obs - n_violations) * alpha**n_violations) /
-            ((1 - p_empirical)**(n_obs - n_violations) * p_empirical**n_violations)
-        )
+    if not np.isnan(kupiec_stat):
         kupiec_pvalue = 1 - stats.chi2.cdf(kupiec_stat, df=1)
         kupiec_result = "✅ ACCEPTÉ" if kupiec_pvalue > 0.05 else "❌ REJETÉ"
     else:
-        kupiec_stat = np.nan
         kupiec_pvalue = np.nan
         kupiec_result = "N/A"
     
-    # Expected Shortfall
-    if n_violations > 0:
-        excess_losses = losses[violations] - var_aligned[violations]
-        avg_excess = excess_losses.mean()
-        max_excess = excess_losses.max()
-    else:
-        avg_excess = 0
-        max_excess = 0
-    
-    # Maximum Drawdown
-    cumulative_returns = (1 + returns_aligned).cumprod()
-    running_max = cumulative_returns.cummax()
-    drawdown = (cumulative_returns - running_max) / running_max
-    max_drawdown = drawdown.min() * 100
-    
     return {
         'model': model_name,
         'n_observations': n_obs,
@@ -340,7 +405,7 @@ def backtest_var(returns, var_estimates, model_name="Model", confidence_level=0.
         'avg_excess': avg_excess,
         'max_excess': max_excess,
         'max_drawdown': max_drawdown,
-        'violations_series': violations
+        'violations_series': pd.Series(violations, index=common_idx)
     }
 
 # Backtesting des deux modèles
@@ -397,7 +462,8 @@ print(f"  📊 Réduction drawdown: {abs(results_trad['max_drawdown'] - results_
 
 # %%
 # Figure complète avec 4 sous-graphiques
-fig = plt.figure(figsize=(16, 12))
+# (nuages de points et aires rastérisés: sortie vectorielle légère, axes et textes restent vectoriels)
+fig = plt.figure(figsize=(16, 12), dpi=100)
 gs = fig.add_gridspec(3, 2, hspace=0.3, wspace=0.3)
 
 # 1. GPR et Événements Majeurs
@@ -405,14 +471,16 @@ ax1 = fig.add_subplot(gs[0, :])
 ax1.plot(data.index, data['GPR'], linewidth=2.5, color='steelblue')
 ax1.axhline(y=200, color='orange', linestyle='--', linewidth=2, alpha=0.7)
 ax1.axhline(y=300, color='red', linestyle='--', linewidth=2, alpha=0.7)
-ax1.fill_between(data.index, 0, data['GPR'], alpha=0.2, color='steelblue')
+ax1.fill_between(data.index, 0, data['GPR'], alpha=0.2, color='steelblue', rasterized=True)
 ax1.set_title('GPR Index: Tensions Géopolitiques', fontsize=15, fontweight='bold')
 ax1.set_ylabel('GPR Index', fontsize=12)
 ax1.grid(True, alpha=0.3)
 
-# Annotations événements majeurs
+# Annotations événements majeurs (position du maximum par np.argmax)
+gpr_values = data['GPR'].to_numpy()
+i_max = int(np.argmax(gpr_values))
 events = [
-    (data.index[data['GPR'].idxmax()], 'Max GPR', data['GPR'].max()),
+    (data.index[i_max], 'Max GPR', gpr_values[i_max]),
 ]
 for date, label, value in events:
     ax1.annotate(label, xy=(date, value), xytext=(10, 20),
@@ -426,12 +494,14 @@ ax2.plot(data.index, data['VaR_Traditional'],
         label='VaR Traditionnelle', linewidth=2, linestyle='--', alpha=0.8)
 ax2.plot(data.index, data['VaR_Geopolitical'], 
         label='VaR Géopolitique', linewidth=2.5, color='green')
-ax2.scatter(data.index[results_trad['violations_series']], 
-           -data['Returns'][results_trad['violations_series']] * 100,
-           color='red', s=50, alpha=0.6, label='Violations Trad.', marker='x')
-ax2.scatter(data.index[results_geo['violations_series']], 
-           -data['Returns'][results_geo['violations_series']] * 100,
-           color='orange', s=30, alpha=0.8, label='Violations Géo.', marker='o')
+# Masques NumPy directs (pas d'indexation booléenne pandas)
+losses_pct = -data['Returns'].to_numpy() * 100
+viol_trad = results_trad['violations_series'].to_numpy()
+viol_geo = results_geo['violations_series'].to_numpy()
+ax2.scatter(data.index[viol_trad], losses_pct[viol_trad],
+           color='red', s=50, alpha=0.6, label='Violations Trad.', marker='x', rasterized=True)
+ax2.scatter(data.index[viol_geo], losses_pct[viol_geo],
+           color='orange', s=30, alpha=0.8, label='Violations Géo.', marker='o', rasterized=True)
 ax2.set_title('VaR et Violations', fontsize=14, fontweight='bold')
 ax2.set_ylabel('VaR / Pertes (%)', fontsize=11)
 ax2.legend(fontsize=9)
@@ -504,14 +574,25 @@ plt.show()
 confidence_levels = [0.90, 0.95, 0.99]
 sensitivity_results = []
 
+# Termes indépendants du niveau de confiance, calculés une seule fois
+mu_t, sigma_t = data['Returns'].mean(), data['Returns'].std()
+mu_g, adj_sigma_g = _prep_var_geo(
+    data['Returns'].to_numpy(dtype=float),
+    data['GPR'].to_numpy(dtype=float),
+    data['Regime'].to_numpy(dtype=np.intp)
+)
+
 for conf in confidence_levels:
-    # VaR traditionnelle
+    # Seul Φ⁻¹(α) dépend du niveau de confiance
     alpha = 1 - conf
-    var_t = -(data['Returns'].mean() + data['Returns'].std() * stats.norm.ppf(alpha)) * 100
+    z = norm_quantile(alpha)
+    
+    # VaR traditionnelle
+    var_t = -(mu_t + sigma_t * z) * 100
     res_t = backtest_var(data['Returns'], var_t, f"Trad {conf*100:.0f}%", conf)
     
     # VaR géopolitique
-    var_g = calculate_var_geopolitical(data['Returns'], data['GPR'], data['Regime'], conf)
+    var_g = pd.Series((-(mu_g + adj_sigma_g * z) * 100).astype(np.float32), index=data.index)
     res_g = backtest_var(data['Returns'], var_g, f"Géo {conf*100:.0f}%", conf)
     
     sensitivity_results.append({
@@ -0,0 +1,121 @@
+"""
+VaR Géopolitique 2.0 - Noyaux numériques du notebook
+Auteur: CHEMLAL Ismail
+Description: Noyaux compilés par numba avec cache disque (cache=True): le code
+machine est écrit dans __pycache__ à la première compilation puis rechargé
+directement aux sessions suivantes. Exécuter une fois
+
+    python var_kernels.py
+
+pour compiler et mettre en cache tous les noyaux avant d'ouvrir le notebook.
+Sans numba, les mêmes fonctions s'exécutent en Python pur.
+"""
+
+import math
+import numpy as np
+
+# Accélération JIT optionnelle (les noyaux tournent en Python pur sans numba)
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    def njit(*args, **kwargs):
+        return lambda func: func
+
+
+@njit(cache=True)
+def rolling_std_welford(x, w):
+    """Écart-type glissant (ddof=1) en un seul passage (mise à jour de Welford)"""
+    n = x.size
+    out = np.full(n, np.nan)
+    mean = 0.0
+    m2 = 0.0
+    for i in range(n):
+        if i < w:
+            # Remplissage de la première fenêtre
+            delta = x[i] - mean
+            mean += delta / (i + 1)
+            m2 += delta * (x[i] - mean)
+        else:
+            # Glissement: x[i] remplace x[i - w]
+            old_mean = mean
+            delta = x[i] - x[i - w]
+            mean += delta / w
+            m2 += delta * (x[i] - mean + x[i - w] - old_mean)
+        if i >= w - 1:
+            out[i] = math.sqrt(max(m2, 0.0) / (w - 1))
+    return out
+
+@njit(cache=True)
+def centered_moving_average(x, w):
+    """Moyenne mobile centrée (fenêtre impaire) par somme glissante, NaN si la fenêtre est incomplète"""
+    n = x.size
+    out = np.full(n, np.nan)
+    half = w // 2
+    total = 0.0
+    n_nan = 0
+    for i in range(n):
+        if np.isnan(x[i]):
+            n_nan += 1
+        else:
+            total += x[i]
+        if i >= w:
+            if np.isnan(x[i - w]):
+                n_nan -= 1
+            else:
+                total -= x[i - w]
+        if i >= w - 1 and n_nan == 0:
+            out[i - half] = total / w
+    return out
+
+@njit(cache=True)
+def backtest_kernel(returns, var, alpha):
+    """Noyau compilé: violations, excès, Kupiec et drawdown en un passage"""
+    n_obs = returns.size
+    n_viol = 0
+    sum_excess = 0.0
+    max_excess = 0.0
+    cumulative = 1.0
+    peak = -np.inf
+    max_dd = 0.0
+    for i in range(n_obs):
+        # Accumulation sans branchement: la comparaison sert de masque 0/1
+        # (sélection plutôt que produit pour qu'une VaR NaN ne pollue pas la somme)
+        diff = -returns[i] * 100 - var[i]
+        pos = diff > 0.0
+        excess = diff if pos else 0.0
+        n_viol += pos
+        sum_excess += excess
+        max_excess = max(max_excess, excess)
+        
+        # Drawdown suivi en scalaires (sans tableaux cumprod/cummax)
+        cumulative *= 1 + returns[i]
+        if cumulative > peak:
+            peak = cumulative
+        drawdown = (cumulative - peak) / peak
+        if drawdown < max_dd:
+            max_dd = drawdown
+    avg_excess = sum_excess / n_viol if n_viol > 0 else 0.0
+    
+    # Kupiec en log-vraisemblance (pas d'underflow des puissances)
+    p = n_viol / n_obs
+    if p > 0.0 and p < 1.0:
+        n_ok = n_obs - n_viol
+        kupiec_stat = -2.0 * (n_ok * math.log1p(-alpha) + n_viol * math.log(alpha)
+                              - n_ok * math.log1p(-p) - n_viol * math.log(p))
+    else:
+        kupiec_stat = np.nan
+    return n_viol, kupiec_stat, avg_excess, max_excess, max_dd * 100
+
+def warmup():
+    """Compile (ou recharge depuis le cache) chaque noyau sur un petit échantillon"""
+    x = np.linspace(-0.02, 0.02, 64)
+    rolling_std_welford(x, 30)
+    centered_moving_average(x, 5)
+    backtest_kernel(x, np.full(x.size, 1.0), 0.05)
+
+if __name__ == '__main__':
+    warmup()
+    print("✅ Noyaux compilés et mis en cache" if NUMBA_AVAILABLE
+          else "⚠️ numba absent: noyaux en Python pur")
@@ -10,7 +10,12 @@ Auteur: CHEMLAL Ismail
 
 import sys
 import os
-from datetime import datetime
+import argparse
+import codecs
+import hashlib
+import importlib.util
+from functools import lru_cache
+from importlib.metadata import version, PackageNotFoundError
 
 # Bannière ASCII
 BANNER = """
@@ -29,153 +34,316 @@ BANNER = """
 ╚═══════════════════════════════════════════════════════════════════════════╝
 """
 
+# Bannière colorée (cyan ANSI), construite une seule fois à l'import;
+# les codes ANSI ne sont émis que vers un terminal (pas dans un fichier ou un pipe)
+_BANNER_CYAN = "\033[96m" + BANNER + "\033[0m"
+_USE_COLOR = sys.stdout.isatty()
+_BANNER_OUT = _BANNER_CYAN if _USE_COLOR else BANNER
+
+# Saisies acceptées dans les menus
+_VALID_CHOICES = frozenset("123456")
+_VALID_CONF = {"90": 0.90, "95": 0.95, "99": 0.99}
+_DEFAULT_TICKER = '^GSPC'
+_EQ79 = "=" * 79
+_DASH79 = "-" * 79
+_REQUIRED_PACKAGES = ('numpy', 'pandas', 'yfinance', 'scipy', 'matplotlib')
+
+def _is_utf8(encoding):
+    """Indique si l'encodage de sortie est de l'UTF-8"""
+    try:
+        return codecs.lookup(encoding or '').name == 'utf-8'
+    except LookupError:
+        return False
+
+# Console non UTF-8 (ex: cp1252 sous Windows): émojis et cadres remplacés par de l'ASCII
+_ASCII_FALLBACK = not _is_utf8(getattr(sys.stdout, 'encoding', None))
+_EMOJI_TT = str.maketrans({
+    '✓': '[OK]', '✅': '[OK]', '✗': '[X]', '❌': '[X]', '⚠': '[!]',
+    '→': '->', '•': '*', '▶': '>', '⏳': '...', '⭐': '*',
+    '═': '=', '║': '|', '╔': '+', '╗': '+', '╚': '+', '╝': '+',
+    '╠': '+', '╣': '+', '█': '#',
+    **dict.fromkeys('✨⚙🌍🎯🐍🐛👉👋💡💾📁📂📄📅📈📊📋📖📚🔍🔬🚀\ufe0f'),
+})
+if _ASCII_FALLBACK and hasattr(sys.stdout, 'reconfigure'):
+    # Filet de sécurité pour les caractères restants (sorties du modèle incluses)
+    sys.stdout.reconfigure(errors='replace')
+
+def _tr(text):
+    """Texte adapté à l'encodage de la console"""
+    return text.translate(_EMOJI_TT) if _ASCII_FALLBACK else text
+
+def _emit(text):
+    """Écrit du texte sur la sortie standard"""
+    sys.stdout.write(_tr(text))
+
+def _write_lines(*lines):
+    """Écrit un bloc de lignes en un seul appel (même sortie que print ligne par ligne)"""
+    _emit("\n".join(lines) + "\n")
+
+_MENU_TEXT = "\n".join((
+    "\n" + _EQ79,
+    "📋 MENU PRINCIPAL",
+    _EQ79,
+    "\n🎯 Choisissez un mode d'exécution:\n",
+    "  1. 🚀 Demo Rapide (S&P 500, 3 ans)",
+    "  2. 📊 Analyse Complète (S&P 500, 5 ans)",
+    "  3. 🌍 Multi-Indices (US, EU, Asia)",
+    "  4. ⚙️  Mode Personnalisé",
+    "  5. 📖 Afficher la Documentation",
+    "  6. ❌ Quitter",
+)) + "\n"
+# Menu encodé une fois pour la console (version ASCII si _ASCII_FALLBACK)
+_MENU_BYTES = _tr(_MENU_TEXT).encode(getattr(sys.stdout, 'encoding', None) or 'utf-8', errors='replace')
+
+# Classe du modèle, importée au premier mode de calcul choisi
+_MODEL_CLS = None
+
+def _get_model():
+    """Importe GeopoliticalVaRModel une seule fois, à la demande"""
+    global _MODEL_CLS
+    if _MODEL_CLS is None:
+        # Import différé: charge numpy/pandas/scipy uniquement si nécessaire
+        from geopolitical_var_model import GeopoliticalVaRModel
+        _MODEL_CLS = GeopoliticalVaRModel
+    return _MODEL_CLS
+
+@lru_cache(maxsize=8)
+def _make_model(confidence, window=252):
+    """Instance de modèle partagée entre les modes (le modèle ne garde aucun état par analyse)"""
+    GeopoliticalVaRModel = _get_model()
+    return GeopoliticalVaRModel(confidence_level=confidence, window=window)
+
+# Résultats d'analyse déjà calculés, indexés par (ticker, années, confiance)
+_analysis_cache = {}
+
+def _cached_analysis(ticker, years, confidence, keep=True):
+    """
+    Exécute run_complete_analysis en réutilisant les résultats déjà calculés
+    pendant la session (keep=False: résultats non conservés en mémoire).
+    Entre deux sessions, le cache Parquet du modèle évite les téléchargements.
+    """
+    key = (ticker, years, confidence)
+    if key in _analysis_cache:
+        _write_lines(f"📂 Résultats {ticker} ({years} ans, {confidence*100:.0f}%) réutilisés depuis la session")
+        return _analysis_cache[key]
+    
+    model = _make_model(confidence, 252)
+    results = model.run_complete_analysis(ticker=ticker, years=years)
+    if keep:
+        _analysis_cache[key] = results
+    return results
+
+def _prefetch_market_data(tickers, years, confidence=0.95):
+    """
+    Remplit le cache Parquet du modèle en un seul téléchargement groupé pour
+    les tickers dont l'analyse n'est pas déjà disponible dans la session
+    """
+    from datetime import datetime, timedelta
+    
+    pending = [t for t in tickers if (t, years, confidence) not in _analysis_cache]
+    if len(pending) < 2:
+        return
+    
+    # Même période que run_complete_analysis
+    end_date = datetime.now()
+    start_date = end_date - timedelta(days=years*365)
+    
+    model = _make_model(confidence, 252)
+    model.prefetch_market_data(pending, start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'))
+
 def print_banner():
     """Affiche la bannière du projet"""
-    print("\033[96m" + BANNER + "\033[0m")
-    print(f"\n📅 Date d'exécution: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    print(f"🐍 Python version: {sys.version.split()[0]}")
-    print("="*79)
+    from datetime import datetime
+    
+    _write_lines(
+        _BANNER_OUT,
+        f"\n📅 Date d'exécution: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+        f"🐍 Python version: {sys.version.split()[0]}",
+        _EQ79,
+    )
+
+def _deps_marker_path():
+    """Fichier témoin d'une vérification réussie, propre à cet interpréteur"""
+    # sha256 plutôt que md5: disponible aussi sur les builds FIPS (Python 3.8 inclus)
+    key = hashlib.sha256((sys.version + sys.prefix).encode()).hexdigest()[:32]
+    return os.path.join(os.path.expanduser('~'), '.cache', 'var-geo', f"deps-{key}.ok")
 
 def check_dependencies():
     """Vérifie que toutes les dépendances sont installées"""
-    print("\n🔍 Vérification des dépendances...")
+    # Vérification déjà réussie pour cet interpréteur: rien à refaire
+    marker = _deps_marker_path()
+    if os.path.exists(marker):
+        _write_lines("\n🔍 Dépendances déjà vérifiées pour cet environnement")
+        return True
     
-    required_packages = {
-        'numpy': 'numpy',
-        'pandas': 'pandas',
-        'yfinance': 'yfinance',
-        'scipy': 'scipy',
-        'matplotlib': 'matplotlib'
-    }
+    _write_lines("\n🔍 Vérification des dépendances...")
     
     missing = []
     installed = []
     
-    for display_name, package_name in required_packages.items():
+    # Lecture des métadonnées d'installation: aucun package n'est importé
+    for package_name in _REQUIRED_PACKAGES:
         try:
-            __import__(package_name)
-            installed.append(display_name)
-            print(f"  ✓ {display_name}")
-        except ImportError:
+            version(package_name)
+            found = True
+        except PackageNotFoundError:
+            # Package installé sans dist-info: recherche du module seul
+            found = importlib.util.find_spec(package_name) is not None
+        
+        if found:
+            installed.append(package_name)
+            _write_lines(f"  ✓ {package_name}")
+        else:
             missing.append(package_name)
-            print(f"  ✗ {display_name}")
+            _write_lines(f"  ✗ {package_name}")
     
     if missing:
-        print("\n⚠️  Packages manquants détectés!")
-        print(f"   Exécutez: pip install {' '.join(missing)}")
-        print("\n   Ou installez tout via: pip install -r requirements.txt")
+        _write_lines("\n⚠️  Packages manquants détectés!")
+        _write_lines(f"   Exécutez: pip install {' '.join(missing)}")
+        _write_lines("\n   Ou installez tout via: pip install -r requirements.txt")
         return False
     
-    print(f"\n✅ Toutes les dépendances sont installées ({len(installed)}/{len(required_packages)})")
+    _write_lines(f"\n✅ Toutes les dépendances sont installées ({len(installed)}/{len(_REQUIRED_PACKAGES)})")
+    try:
+        os.makedirs(os.path.dirname(marker), exist_ok=True)
+        open(marker, 'a').close()
+    except OSError:
+        pass  # Pas de cache: la vérification sera refaite au prochain lancement
     return True
 
+def _report_import_error(error):
+    """
+    Signale un module manquant et oublie la vérification mémorisée des
+    dépendances, pour qu'elle soit refaite au prochain lancement
+    """
+    try:
+        os.remove(_deps_marker_path())
+    except OSError:
+        pass
+    if error.name == 'geopolitical_var_model':
+        _write_lines("\n❌ ERREUR: geopolitical_var_model.py non trouvé!")
+        _write_lines("   Assurez-vous que le fichier est dans le même répertoire.")
+    else:
+        _write_lines(f"\n❌ ERREUR: module manquant ({error.name or error})")
+        _write_lines("   Installez les dépendances via: pip install -r requirements.txt")
+
 def interactive_menu():
     """Menu interactif pour choisir le mode d'exécution"""
-    print("\n" + "="*79)
-    print("📋 MENU PRINCIPAL")
-    print("="*79)
-    print("\n🎯 Choisissez un mode d'exécution:\n")
-    print("  1. 🚀 Demo Rapide (S&P 500, 3 ans)")
-    print("  2. 📊 Analyse Complète (S&P 500, 5 ans)")
-    print("  3. 🌍 Multi-Indices (US, EU, Asia)")
-    print("  4. ⚙️  Mode Personnalisé")
-    print("  5. 📖 Afficher la Documentation")
-    print("  6. ❌ Quitter")
+    # Texte déjà encodé: un seul appel système, sans passer par le flux texte.
+    # Console Windows exclue: son flux texte transcode vers la page de code de
+    # la console (PEP 528), ce que des octets UTF-8 bruts ne feraient pas
+    fd = None
+    if not (sys.platform == 'win32' and _USE_COLOR):
+        try:
+            fd = sys.stdout.fileno()
+        except (AttributeError, OSError, ValueError):
+            fd = None  # Sortie redirigée vers un objet sans descripteur (IDE, notebook)
+    if fd is None:
+        _emit(_MENU_TEXT)
+    else:
+        sys.stdout.flush()
+        os.write(fd, _MENU_BYTES)
     
     while True:
         try:
-            choice = input("\n👉 Votre choix (1-6): ").strip()
-            if choice in ['1', '2', '3', '4', '5', '6']:
+            choice = input(_tr("\n👉 Votre choix (1-6): ")).strip()
+            if choice in _VALID_CHOICES:
                 return choice
             else:
-                print("⚠️  Choix invalide. Veuillez entrer un nombre entre 1 et 6.")
+                _write_lines("⚠️  Choix invalide. Veuillez entrer un nombre entre 1 et 6.")
         except KeyboardInterrupt:
-            print("\n\n👋 Interruption détectée. Au revoir!")
+            _write_lines("\n\n👋 Interruption détectée. Au revoir!")
             sys.exit(0)
 
 def run_quick_demo():
     """Mode 1: Démonstration rapide"""
-    print("\n" + "="*79)
-    print("🚀 MODE: DEMO RAPIDE")
-    print("="*79)
-    print("\nConfiguration:")
-    print("  • Indice: S&P 500 (^GSPC)")
-    print("  • Période: 3 ans")
-    print("  • Niveau de confiance: 95%")
-    print("\n⏳ Démarrage de l'analyse...\n")
+    _write_lines(
+        "\n" + _EQ79,
+        "🚀 MODE: DEMO RAPIDE",
+        _EQ79,
+        "\nConfiguration:",
+        "  • Indice: S&P 500 (^GSPC)",
+        "  • Période: 3 ans",
+        "  • Niveau de confiance: 95%",
+        "\n⏳ Démarrage de l'analyse...\n",
+    )
     
     try:
-        from geopolitical_var_model import GeopoliticalVaRModel
-        
-        model = GeopoliticalVaRModel(confidence_level=0.95, window=252)
-        results = model.run_complete_analysis(ticker='^GSPC', years=3)
-        
-        print("\n" + "="*79)
-        print("✨ RÉSUMÉ DES RÉSULTATS")
-        print("="*79)
+        results = _cached_analysis('^GSPC', 3, 0.95)
         
         improvement = results['improvement']
         n_obs = results['results_geopolitical']['n_observations']
         
-        print(f"\n📊 Données analysées: {n_obs} jours de trading")
-        print(f"🎯 Amélioration du modèle: {improvement:.1f}%")
-        print(f"✅ Test de Kupiec: {results['results_geopolitical']['kupiec_result']}")
+        _write_lines(
+            "\n" + _EQ79,
+            "✨ RÉSUMÉ DES RÉSULTATS",
+            _EQ79,
+            f"\n📊 Données analysées: {n_obs} jours de trading",
+            f"🎯 Amélioration du modèle: {improvement:.1f}%",
+            f"✅ Test de Kupiec: {results['results_geopolitical']['kupiec_result']}",
+        )
         
-        print("\n💡 Recommandation:")
+        _write_lines("\n💡 Recommandation:")
         if improvement > 20:
-            print("   Le modèle géopolitique apporte une amélioration SIGNIFICATIVE!")
+            _write_lines("   Le modèle géopolitique apporte une amélioration SIGNIFICATIVE!")
         elif improvement > 10:
-            print("   Le modèle géopolitique améliore modérément les prévisions.")
+            _write_lines("   Le modèle géopolitique améliore modérément les prévisions.")
         else:
-            print("   Les deux modèles ont des performances comparables.")
+            _write_lines("   Les deux modèles ont des performances comparables.")
         
         return True
         
-    except ImportError:
-        print("\n❌ ERREUR: geopolitical_var_model.py non trouvé!")
-        print("   Assurez-vous que le fichier est dans le même répertoire.")
+    except ImportError as e:
+        _report_import_error(e)
         return False
     except Exception as e:
-        print(f"\n❌ ERREUR lors de l'exécution: {str(e)}")
+        _write_lines(f"\n❌ ERREUR lors de l'exécution: {str(e)}")
         return False
 
 def run_full_analysis():
     """Mode 2: Analyse complète"""
-    print("\n" + "="*79)
-    print("📊 MODE: ANALYSE COMPLÈTE")
-    print("="*79)
-    print("\nConfiguration:")
-    print("  • Indice: S&P 500 (^GSPC)")
-    print("  • Période: 5 ans")
-    print("  • Niveau de confiance: 95%")
-    print("  • Exports: CSV + Graphiques")
-    print("\n⏳ Démarrage de l'analyse complète (cela peut prendre 1-2 minutes)...\n")
+    _write_lines(
+        "\n" + _EQ79,
+        "📊 MODE: ANALYSE COMPLÈTE",
+        _EQ79,
+        "\nConfiguration:",
+        "  • Indice: S&P 500 (^GSPC)",
+        "  • Période: 5 ans",
+        "  • Niveau de confiance: 95%",
+        "  • Exports: CSV + Graphiques",
+        "\n⏳ Démarrage de l'analyse complète (cela peut prendre 1-2 minutes)...\n",
+    )
     
     try:
-        from geopolitical_var_model import GeopoliticalVaRModel
+        results = _cached_analysis('^GSPC', 5, 0.95)
         
-        model = GeopoliticalVaRModel(confidence_level=0.95, window=252)
-        results = model.run_complete_analysis(ticker='^GSPC', years=5)
+        # Vérifier les fichiers exportés (un seul parcours du répertoire)
+        expected = ('var_geopolitical_results.csv', 'var_geopolitical_analysis.png')
+        with os.scandir('.') as entries:
+            present = {entry.name for entry in entries if entry.name in expected}
         
-        # Vérifier les fichiers exportés
-        print("\n📁 Fichiers générés:")
-        if os.path.exists('var_geopolitical_results.csv'):
-            print("  ✓ var_geopolitical_results.csv")
-        if os.path.exists('var_geopolitical_analysis.png'):
-            print("  ✓ var_geopolitical_analysis.png")
+        _write_lines("\n📁 Fichiers générés:")
+        for filename in expected:
+            if filename in present:
+                _write_lines(f"  ✓ {filename}")
         
-        print("\n💾 Utilisez ces fichiers pour des analyses supplémentaires!")
+        _write_lines("\n💾 Utilisez ces fichiers pour des analyses supplémentaires!")
         return True
         
+    except ImportError as e:
+        _report_import_error(e)
+        return False
     except Exception as e:
-        print(f"\n❌ ERREUR: {str(e)}")
+        _write_lines(f"\n❌ ERREUR: {str(e)}")
         return False
 
 def run_multi_indices():
     """Mode 3: Analyse multi-indices"""
-    print("\n" + "="*79)
-    print("🌍 MODE: ANALYSE MULTI-INDICES")
-    print("="*79)
+    _write_lines(
+        "\n" + _EQ79,
+        "🌍 MODE: ANALYSE MULTI-INDICES",
+        _EQ79,
+    )
     
     indices = {
         'S&P 500 (US)': '^GSPC',
@@ -183,176 +351,188 @@ def run_multi_indices():
         'Nikkei 225 (Japan)': '^N225'
     }
     
-    print("\nIndices à analyser:")
-    for name in indices.keys():
-        print(f"  • {name}")
-    
-    print("\n⏳ Démarrage des analyses (cela peut prendre 3-5 minutes)...\n")
+    _write_lines(
+        "\nIndices à analyser:",
+        *(f"  • {name}" for name in indices.keys()),
+        "\n⏳ Démarrage des analyses (cela peut prendre 3-5 minutes)...\n",
+    )
     
     try:
-        from geopolitical_var_model import GeopoliticalVaRModel
+        summary = {}
         
-        results_all = {}
+        # Téléchargement groupé, puis calculs séquentiels sur les données en cache
+        _prefetch_market_data(indices.values(), years=3)
         
         for name, ticker in indices.items():
-            print(f"\n📊 Analyse: {name}")
-            print("-" * 79)
+            _write_lines(f"\n📊 Analyse: {name}")
+            _write_lines(_DASH79)
             
-            model = GeopoliticalVaRModel(confidence_level=0.95, window=252)
-            results_all[name] = model.run_complete_analysis(ticker=ticker, years=3)
+            # Seuls les scalaires du résumé sont conservés, pas les séries complètes
+            results = _cached_analysis(ticker, 3, 0.95, keep=False)
+            summary[name] = (results['improvement'], results['results_geopolitical']['kupiec_result'])
+            del results
         
         # Résumé comparatif
-        print("\n" + "="*79)
-        print("📊 COMPARAISON MULTI-INDICES")
-        print("="*79)
-        print(f"\n{'Indice':<20} {'Amélioration':<15} {'Test Kupiec':<15}")
-        print("-" * 79)
+        _write_lines(
+            "\n" + _EQ79,
+            "📊 COMPARAISON MULTI-INDICES",
+            _EQ79,
+            f"\n{'Indice':<20} {'Amélioration':<15} {'Test Kupiec':<15}",
+            _DASH79,
+        )
         
-        for name in indices.keys():
-            improvement = results_all[name]['improvement']
-            kupiec = results_all[name]['results_geopolitical']['kupiec_result']
-            print(f"{name:<20} {improvement:>6.1f}%{'':<8} {kupiec:<15}")
+        for name, (improvement, kupiec) in summary.items():
+            _write_lines(f"{name:<20} {improvement:>6.1f}%{'':<8} {kupiec:<15}")
         
         return True
         
+    except ImportError as e:
+        _report_import_error(e)
+        return False
     except Exception as e:
-        print(f"\n❌ ERREUR: {str(e)}")
+        _write_lines(f"\n❌ ERREUR: {str(e)}")
         return False
 
-def run_custom_mode():
-    """Mode 4: Configuration personnalisée"""
-    print("\n" + "="*79)
-    print("⚙️  MODE: PERSONNALISÉ")
-    print("="*79)
+def _prompt_custom_config():
+    """Saisie interactive de la configuration; None si l'analyse est annulée"""
+    # Saisie du ticker
+    _write_lines("\n📈 Quel indice souhaitez-vous analyser?")
+    _write_lines("   Exemples: ^GSPC (S&P 500), ^STOXX50E (EuroStoxx), ^N225 (Nikkei)")
+    ticker = input(_tr("   Ticker: ")).strip().upper()
+    if not ticker:
+        ticker = _DEFAULT_TICKER
+        _write_lines(f"   → Utilisation de la valeur par défaut: {ticker}")
     
+    # Saisie de la période
+    _write_lines("\n📅 Nombre d'années d'historique?")
+    years_input = input(_tr("   Années (1-10, défaut=5): ")).strip()
     try:
-        # Saisie du ticker
-        print("\n📈 Quel indice souhaitez-vous analyser?")
-        print("   Exemples: ^GSPC (S&P 500), ^STOXX50E (EuroStoxx), ^N225 (Nikkei)")
-        ticker = input("   Ticker: ").strip().upper()
-        if not ticker:
-            ticker = '^GSPC'
-            print(f"   → Utilisation de la valeur par défaut: {ticker}")
-        
-        # Saisie de la période
-        print("\n📅 Nombre d'années d'historique?")
-        years_input = input("   Années (1-10, défaut=5): ").strip()
-        years = int(years_input) if years_input.isdigit() and 1 <= int(years_input) <= 10 else 5
-        print(f"   → Période sélectionnée: {years} ans")
-        
-        # Saisie du niveau de confiance
-        print("\n🎯 Niveau de confiance pour la VaR?")
-        conf_input = input("   Confiance (90, 95, 99, défaut=95): ").strip()
-        if conf_input in ['90', '95', '99']:
-            confidence = int(conf_input) / 100
-        else:
-            confidence = 0.95
-        print(f"   → Niveau de confiance: {confidence*100:.0f}%")
-        
-        # Confirmation
-        print("\n" + "-"*79)
-        print("✅ Configuration:")
-        print(f"   • Ticker: {ticker}")
-        print(f"   • Période: {years} ans")
-        print(f"   • Confiance: {confidence*100:.0f}%")
-        print("-"*79)
-        
-        confirm = input("\n▶️  Lancer l'analyse? (O/n): ").strip().lower()
-        if confirm == 'n':
-            print("❌ Analyse annulée.")
-            return False
-        
-        print("\n⏳ Démarrage de l'analyse personnalisée...\n")
+        years = int(years_input)
+    except ValueError:
+        years = 5
+    if not 1 <= years <= 10:
+        years = 5
+    _write_lines(f"   → Période sélectionnée: {years} ans")
+    
+    # Saisie du niveau de confiance
+    _write_lines("\n🎯 Niveau de confiance pour la VaR?")
+    conf_input = input(_tr("   Confiance (90, 95, 99, défaut=95): ")).strip()
+    confidence = _VALID_CONF.get(conf_input, 0.95)
+    _write_lines(f"   → Niveau de confiance: {confidence*100:.0f}%")
+    
+    # Confirmation
+    _write_lines(
+        "\n" + _DASH79,
+        "✅ Configuration:",
+        f"   • Ticker: {ticker}",
+        f"   • Période: {years} ans",
+        f"   • Confiance: {confidence*100:.0f}%",
+        _DASH79,
+    )
+    
+    confirm = input(_tr("\n▶️  Lancer l'analyse? (O/n): ")).strip().lower()
+    if confirm == 'n':
+        _write_lines("❌ Analyse annulée.")
+        return None
+    return ticker, years, confidence
+
+def run_custom_mode(ticker=None, years=5, confidence=0.95):
+    """Mode 4: Configuration personnalisée (saisie interactive si aucun ticker n'est fourni)"""
+    _write_lines(
+        "\n" + _EQ79,
+        "⚙️  MODE: PERSONNALISÉ",
+        _EQ79,
+    )
+    
+    try:
+        if ticker is None:
+            config = _prompt_custom_config()
+            if config is None:
+                return False
+            ticker, years, confidence = config
         
-        from geopolitical_var_model import GeopoliticalVaRModel
+        _write_lines("\n⏳ Démarrage de l'analyse personnalisée...\n")
         
-        model = GeopoliticalVaRModel(confidence_level=confidence, window=252)
-        results = model.run_complete_analysis(ticker=ticker, years=years)
+        results = _cached_analysis(ticker, years, confidence)
         
-        print("\n✅ Analyse personnalisée terminée avec succès!")
+        _write_lines("\n✅ Analyse personnalisée terminée avec succès!")
         return True
         
     except ValueError:
-        print("\n❌ ERREUR: Valeur invalide saisie.")
+        _write_lines("\n❌ ERREUR: Valeur invalide saisie.")
+        return False
+    except ImportError as e:
+        _report_import_error(e)
         return False
     except Exception as e:
-        print(f"\n❌ ERREUR: {str(e)}")
+        _write_lines(f"\n❌ ERREUR: {str(e)}")
         return False
 
+_DOC_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'docs', 'quick-start-doc.txt')
+
+@lru_cache(maxsize=None)
+def _load_documentation():
+    """Texte de la documentation rapide, lu sur disque à la première consultation"""
+    try:
+        with open(_DOC_PATH, encoding='utf-8') as f:
+            return f.read()
+    except OSError:
+        return "\nDocumentation introuvable: consultez README.md\n"
+
 def show_documentation():
     """Mode 5: Afficher la documentation"""
-    print("\n" + "="*79)
-    print("📖 DOCUMENTATION RAPIDE")
-    print("="*79)
+    _write_lines(
+        "\n" + _EQ79,
+        "📖 DOCUMENTATION RAPIDE",
+        _EQ79,
+    )
     
-    doc = """
-╔═══════════════════════════════════════════════════════════════════════════╗
-║ QU'EST-CE QUE LA VaR (VALUE-AT-RISK) ?                                   ║
-╠═══════════════════════════════════════════════════════════════════════════╣
-║ La VaR est une mesure statistique qui estime la perte maximale probable  ║
-║ d'un portefeuille sur une période donnée avec un niveau de confiance     ║
-║ spécifique.                                                               ║
-║                                                                           ║
-║ Exemple: VaR 95% = 2.5%                                                  ║
-║ → Il y a 5% de chance de perdre plus de 2.5% du capital.                ║
-╚═══════════════════════════════════════════════════════════════════════════╝
-
-╔═══════════════════════════════════════════════════════════════════════════╗
-║ POURQUOI UN MODÈLE GÉOPOLITIQUE ?                                        ║
-╠═══════════════════════════════════════════════════════════════════════════╣
-║ Les modèles VaR traditionnels échouent lors de crises géopolitiques car: ║
-║                                                                           ║
-║  ❌ Ils supposent la stabilité des paramètres                            ║
-║  ❌ Ils ignorent les signaux d'alerte précoce                            ║
-║  ❌ Ils sous-estiment les événements extrêmes                            ║
-║                                                                           ║
-║ Notre modèle intègre:                                                     ║
-║  ✅ GPR Index (tensions géopolitiques)                                   ║
-║  ✅ Régimes de marché dynamiques                                         ║
-║  ✅ Adaptation temps réel aux crises                                     ║
-╚═══════════════════════════════════════════════════════════════════════════╝
-
-╔═══════════════════════════════════════════════════════════════════════════╗
-║ FICHIERS GÉNÉRÉS                                                          ║
-╠═══════════════════════════════════════════════════════════════════════════╣
-║  📄 var_geopolitical_results.csv                                         ║
-║     → Données complètes: prix, rendements, VaR, régimes                  ║
-║                                                                           ║
-║  📊 var_geopolitical_analysis.png                                        ║
-║     → Graphiques: GPR, VaR comparison, régimes, performance              ║
-║                                                                           ║
-║  📈 backtest_metrics.csv                                     ║
-║     → Métriques détaillées des deux modèles                              ║
-╚═══════════════════════════════════════════════════════════════════════════╝
-
-╔═══════════════════════════════════════════════════════════════════════════╗
-║ INTERPRÉTATION DES RÉSULTATS                                             ║
-╠═══════════════════════════════════════════════════════════════════════════╣
-║ Test de Kupiec:                                                           ║
-║   ✅ ACCEPTÉ → Le modèle est statistiquement valide                      ║
-║   ❌ REJETÉ  → Taux de violation trop élevé, modèle imprécis            ║
-║                                                                           ║
-║ Amélioration:                                                             ║
-║   > 20% → Amélioration SIGNIFICATIVE                                     ║
-║   10-20% → Amélioration MODÉRÉE                                          ║
-║   < 10% → Amélioration FAIBLE                                            ║
-╚═══════════════════════════════════════════════════════════════════════════╝
-
-Pour plus d'informations, consultez README.md
-    """
+    doc = _load_documentation()
     
-    print(doc)
-    input("\n📖 Appuyez sur Entrée pour revenir au menu...")
+    _emit(doc + "\n")
+    input(_tr("\n📖 Appuyez sur Entrée pour revenir au menu..."))
 
-def main():
+def main(argv=None):
     """Point d'entrée principal"""
-    print_banner()
+    parser = argparse.ArgumentParser(description="VaR Géopolitique 2.0 - Démarrage rapide")
+    parser.add_argument('--mode', choices=('quick', 'full', 'multi', 'custom'),
+                        help="Lance directement un mode, sans bannière ni menu interactif")
+    # Options propres au mode custom: None = non fournie (valeur par défaut appliquée plus bas)
+    parser.add_argument('--ticker',
+                        help=f"Ticker analysé en mode custom (défaut: {_DEFAULT_TICKER})")
+    parser.add_argument('--years', type=int, choices=range(1, 11), metavar='{1-10}',
+                        help="Années d'historique en mode custom (défaut: 5)")
+    parser.add_argument('--confidence', choices=sorted(_VALID_CONF),
+                        help="Niveau de confiance en %% en mode custom (défaut: 95)")
+    parser.add_argument('--fast', action='store_true',
+                        help="Ne pas vérifier les dépendances")
+    args = parser.parse_args(argv)
+    if args.mode != 'custom' and (args.ticker, args.years, args.confidence) != (None, None, None):
+        parser.error("--ticker, --years et --confidence ne s'utilisent qu'avec --mode custom")
     
-    # Vérification des dépendances
-    if not check_dependencies():
-        print("\n❌ Installation requise avant de continuer.")
+    if args.mode is None:
+        print_banner()
+    
+    # Vérification des dépendances (--fast: ignorée)
+    if not args.fast and not check_dependencies():
+        _write_lines("\n❌ Installation requise avant de continuer.")
         sys.exit(1)
     
+    # Mode non interactif: exécution directe puis sortie
+    if args.mode is not None:
+        runners = {
+            'quick': run_quick_demo,
+            'full': run_full_analysis,
+            'multi': run_multi_indices,
+            'custom': lambda: run_custom_mode(
+                (args.ticker or '').strip().upper() or _DEFAULT_TICKER,
+                5 if args.years is None else args.years,
+                _VALID_CONF[args.confidence or '95'],
+            ),
+        }
+        success = runners[args.mode]()
+        sys.exit(0 if success else 1)
+    
     # Boucle principale du menu
     while True:
         choice = interactive_menu()
@@ -360,17 +540,17 @@ def main():
         if choice == '1':
             success = run_quick_demo()
             if success:
-                print("\n✅ Demo rapide terminée avec succès!")
+                _write_lines("\n✅ Demo rapide terminée avec succès!")
         
         elif choice == '2':
             success = run_full_analysis()
             if success:
-                print("\n✅ Analyse complète terminée avec succès!")
+                _write_lines("\n✅ Analyse complète terminée avec succès!")
         
         elif choice == '3':
             success = run_multi_indices()
             if success:
-                print("\n✅ Analyse multi-indices terminée avec succès!")
+                _write_lines("\n✅ Analyse multi-indices terminée avec succès!")
         
         elif choice == '4':
             run_custom_mode()
@@ -380,36 +560,38 @@ def main():
             continue  # Retour direct au menu
         
         elif choice == '6':
-            print("\n" + "="*79)
-            print("👋 Merci d'avoir utilisé VaR Géopolitique 2.0!")
-            print("="*79)
-            print("\n📚 Pour aller plus loin:")
-            print("  • Consultez README.md pour la documentation complète")
-            print("  • Explorez var_geopolitique_analysis.ipynb pour l'analyse interactive")
-            print("  • Visitez le repository GitHub pour les mises à jour")
-            print("\n💡 N'oubliez pas de ⭐ le projet si vous l'avez trouvé utile!")
-            print("\n🔬 Développé par CHEMLAL Ismail - 2025")
-            print("="*79 + "\n")
+            _write_lines(
+                "\n" + _EQ79,
+                "👋 Merci d'avoir utilisé VaR Géopolitique 2.0!",
+                _EQ79,
+                "\n📚 Pour aller plus loin:",
+                "  • Consultez README.md pour la documentation complète",
+                "  • Explorez var_geopolitique_analysis.ipynb pour l'analyse interactive",
+                "  • Visitez le repository GitHub pour les mises à jour",
+                "\n💡 N'oubliez pas de ⭐ le projet si vous l'avez trouvé utile!",
+                "\n🔬 Développé par CHEMLAL Ismail - 2025",
+                _EQ79 + "\n",
+            )
             sys.exit(0)
         
         # Proposer de continuer ou quitter
-        print("\n" + "-"*79)
-        continue_choice = input("▶️  Voulez-vous effectuer une autre analyse? (O/n): ").strip().lower()
+        _write_lines("\n" + _DASH79)
+        continue_choice = input(_tr("▶️  Voulez-vous effectuer une autre analyse? (O/n): ")).strip().lower()
         if continue_choice == 'n':
-            print("\n👋 Au revoir!")
+            _write_lines("\n👋 Au revoir!")
             sys.exit(0)
 
 if __name__ == "__main__":
     try:
         main()
     except KeyboardInterrupt:
-        print("\n\n⚠️  Programme interrompu par l'utilisateur.")
-        print("👋 Au revoir!")
+        _write_lines("\n\n⚠️  Programme interrompu par l'utilisateur.")
+        _write_lines("👋 Au revoir!")
         sys.exit(0)
     except Exception as e:
-        print(f"\n❌ ERREUR CRITIQUE: {str(e)}")
-        print("\n🐛 Si le problème persiste, veuillez:")
-        print("  1. Vérifier que toutes les dépendances sont installées")
-        print("  2. Consulter la documentation dans README.md")
-        print("  3. Ouvrir une issue sur GitHub avec le message d'erreur")
+        _write_lines(f"\n❌ ERREUR CRITIQUE: {str(e)}")
+        _write_lines("\n🐛 Si le problème persiste, veuillez:")
+        _write_lines("  1. Vérifier que toutes les dépendances sont installées")
+        _write_lines("  2. Consulter la documentation dans README.md")
+        _write_lines("  3. Ouvrir une issue sur GitHub avec le message d'erreur")
         sys.exit(1)